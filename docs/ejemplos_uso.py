@@ -4,7 +4,8 @@ Ejemplos de uso del Video Frame Extractor
 Este script muestra diferentes formas de usar el extractor de frames.
 """
 
-import os
+import shlex
+import subprocess
 import sys
 
 # Ejemplos de comandos que puedes ejecutar
@@ -96,11 +97,11 @@ def interactive_mode():
     print("  [2] Número específico")
     num_choice = input("Opción (1-2): ").strip()
     
-    num_frames_arg = ""
+    num_frames_args = []
     if num_choice == "2":
         num_frames = input("Cantidad de frames: ").strip()
         if num_frames:
-            num_frames_arg = f"-n {num_frames}"
+            num_frames_args = ["-n", num_frames]
     
     # Dimensiones
     print("\n¿Qué dimensiones deseas?")
@@ -110,16 +111,16 @@ def interactive_mode():
     print("  [4] Personalizado")
     dim_choice = input("Opción (1-4): ").strip()
     
-    dimensions_arg = ""
+    dimensions_args = []
     if dim_choice == "2":
-        dimensions_arg = "-w 1920 -h 1080"
+        dimensions_args = ["-w", "1920", "-h", "1080"]
     elif dim_choice == "3":
-        dimensions_arg = "-w 1280 -h 720"
+        dimensions_args = ["-w", "1280", "-h", "720"]
     elif dim_choice == "4":
         width = input("Ancho (px): ").strip()
         height = input("Alto (px): ").strip()
         if width and height:
-            dimensions_arg = f"-w {width} -h {height}"
+            dimensions_args = ["-w", width, "-h", height]
     
     # Calidad
     print("\n¿Qué calidad JPEG deseas? (0-100)")
@@ -129,31 +130,31 @@ def interactive_mode():
     print("  [4] Personalizada")
     quality_choice = input("Opción (1-4): ").strip()
     
-    quality_arg = ""
+    quality_args = []
     if quality_choice == "2":
-        quality_arg = "-q 85"
+        quality_args = ["-q", "85"]
     elif quality_choice == "3":
-        quality_arg = "-q 75"
+        quality_args = ["-q", "75"]
     elif quality_choice == "4":
         quality = input("Calidad (0-100): ").strip()
         if quality:
-            quality_arg = f"-q {quality}"
+            quality_args = ["-q", quality]
     
     # Directorio de salida
     output_dir = input("\n📂 Directorio de salida (Enter para 'frames_output'): ").strip()
-    output_arg = f"-o {output_dir}" if output_dir else ""
+    output_args = ["-o", output_dir] if output_dir else []
     
-    # Construir comando
+    # Construir comando como lista de argumentos (sin pasar por la shell)
     command_parts = [
-        "python video_frame_extractor_cv2.py",
+        "video_frame_extractor_cv2.py",
         video_file,
-        num_frames_arg,
-        dimensions_arg,
-        quality_arg,
-        output_arg
+        *num_frames_args,
+        *dimensions_args,
+        *quality_args,
+        *output_args
     ]
     
-    command = " ".join(filter(None, command_parts))
+    command = shlex.join(["python", *command_parts])
     
     print("\n" + "=" * 70)
     print("✨ COMANDO GENERADO:")
@@ -165,7 +166,7 @@ def interactive_mode():
     run = input("\n¿Ejecutar este comando ahora? (s/n): ").strip().lower()
     if run == 's':
         print("\n🚀 Ejecutando...\n")
-        os.system(command)
+        subprocess.run([sys.executable, *command_parts], check=False)
     else:
         print("\n💾 Copia el comando de arriba para ejecutarlo más tarde")
 
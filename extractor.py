@@ -0,0 +1,480 @@
+"""
+Núcleo de extracción de frames: decodificación por lotes (Decord o torchcodec),
+resize con padding y codificación/escritura en paralelo.
+"""
+
+import io
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from functools import partial
+from itertools import repeat
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterator, Optional
+
+from rich.console import Console
+from rich.progress import (
+    Progress,
+    SpinnerColumn,
+    BarColumn,
+    TextColumn,
+    TimeRemainingColumn,
+    MofNCompleteColumn,
+)
+
+# decord, numpy y PIL se importan al usarse: `--help` no paga su carga (~0.5 s)
+if TYPE_CHECKING:
+    import numpy as np
+    from decord import VideoReader
+
+# Frames por lote: decodificación (get_batch) y buffer de salida (B, H, W, 3)
+BATCH_SIZE = 16
+# Tope de --batch-size: cada lote reserva dos buffers de salida (B, H, W, 3)
+MAX_BATCH_SIZE = 64
+# Hilos para resize + encode (liberan el GIL)
+MAX_WORKERS = 8
+# Frames codificados en espera de escritura a disco
+WRITE_QUEUE_SIZE = 32
+# Hilos internos del decoder (FFmpeg)
+DECODE_THREADS = max(1, (os.cpu_count() or 2) // 2)
+# Por debajo de esta escala se reduce primero por promedio de área y luego Lanczos
+DOWNSCALE_RATIO = 0.5
+# Frames finales que el conteo aproximado de torchcodec puede sobrestimar
+TAIL_SLACK_FRAMES = 8
+
+
+def _load_jpeg_encoder() -> Optional[Callable[..., bytes]]:
+    """Retorna un encoder JPEG de libjpeg-turbo (PyTurboJPEG) o None si no está instalado."""
+    try:
+        from turbojpeg import TJPF_RGB, TurboJPEG
+
+        return partial(TurboJPEG().encode, pixel_format=TJPF_RGB)
+    except (ImportError, OSError, RuntimeError):
+        return None
+
+
+def _load_simd_resizer():
+    """Retorna el módulo cykooz_resizer (resize SIMD) o None si no está instalado."""
+    try:
+        import cykooz_resizer
+
+        return cykooz_resizer
+    except ImportError:
+        return None
+
+
+class ImageFormat(str, Enum):
+    """Formatos de imagen soportados."""
+    jpg = "jpg"
+    png = "png"
+    webp = "webp"
+
+
+class _FrameWriter:
+    """Escribe a disco frames ya codificados desde un hilo dedicado."""
+
+    def __init__(self, maxsize: int = WRITE_QUEUE_SIZE):
+        self._queue: queue.Queue[Optional[tuple[Path, bytes]]] = queue.Queue(maxsize=maxsize)
+        self._error: Optional[OSError] = None
+        self._thread = threading.Thread(target=self._run, name="frame-writer", daemon=True)
+
+    def __enter__(self) -> "_FrameWriter":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        if exc_type is None and self._error is not None:
+            raise self._error
+
+    def put(self, filepath: Path, data: bytes) -> None:
+        """Encola un frame; propaga el primer error de escritura."""
+        if self._error is not None:
+            raise self._error
+        self._queue.put((filepath, data))
+
+    def _run(self) -> None:
+        while (item := self._queue.get()) is not None:
+            if self._error is not None:
+                continue  # seguir vaciando la cola tras un error
+            filepath, data = item
+            try:
+                filepath.write_bytes(data)
+            except OSError as e:
+                self._error = e
+
+
+class Backend(str, Enum):
+    """Backends de decodificación soportados."""
+    decord = "decord"
+    torchcodec = "torchcodec"
+
+
+class VideoFrameExtractor:
+    """Extractor de frames de video usando Decord o torchcodec (2-3x más rápido que OpenCV)."""
+
+    def __init__(
+        self,
+        video_path: str,
+        use_gpu: bool = False,
+        gpu_id: int = 0,
+        backend: Backend = Backend.decord,
+    ):
+        self.video_path = video_path
+        self.use_gpu = use_gpu
+        self.backend = backend
+        if backend == Backend.torchcodec:
+            self._open_torchcodec(gpu_id)
+        else:
+            self._open_decord(gpu_id)
+        self.duration = self.total_frames / self.fps if self.fps > 0 else 0
+        self._jpeg_encoder = _load_jpeg_encoder()
+        self._simd_resizer = _load_simd_resizer()
+        self._local = threading.local()
+        self._resize_plan_cache: Optional[tuple[tuple[int, int], tuple]] = None
+
+    def _open_decord(self, gpu_id: int) -> None:
+        """Abre el video con Decord (acceso aleatorio por índice)."""
+        from decord import VideoReader, cpu, gpu
+
+        self._ctx = gpu(gpu_id) if self.use_gpu else cpu(0)
+        self.vr = VideoReader(self.video_path, ctx=self._ctx, num_threads=DECODE_THREADS)
+        self.fps = self.vr.get_avg_fps()
+        self.total_frames = len(self.vr)
+        # Un solo decode del frame 0 para obtener dimensiones
+        self.height, self.width = self.vr[0].shape[:2]
+        if self.use_gpu:
+            # En GPU se decodifica con un reader redimensionado (_resized_reader): este solo
+            # valida NVDEC y lee metadatos, así que se libera para no retener dos sesiones en VRAM
+            self.vr = None
+
+    def _open_torchcodec(self, gpu_id: int) -> None:
+        """Abre el video con torchcodec (seek aproximado, metadatos sin decodificar)."""
+        from torchcodec.decoders import VideoDecoder
+
+        self.decoder = VideoDecoder(
+            self.video_path,
+            dimension_order="NHWC",
+            num_ffmpeg_threads=DECODE_THREADS,
+            device=f"cuda:{gpu_id}" if self.use_gpu else "cpu",
+            seek_mode="approximate",
+        )
+        metadata = self.decoder.metadata
+        if metadata.num_frames is None:
+            # Algunos contenedores (MKV/WebM) no declaran el número de frames en el header
+            raise ValueError(
+                "torchcodec no pudo determinar el número de frames de este video; usa --backend decord"
+            )
+        self.fps = metadata.average_fps or 0
+        self.total_frames = metadata.num_frames
+        self.width, self.height = metadata.width, metadata.height
+
+    def get_info(self) -> dict:
+        """Retorna metadatos del video."""
+        return {
+            "fps": self.fps,
+            "total_frames": self.total_frames,
+            "width": self.width,
+            "height": self.height,
+            "duration": self.duration,
+        }
+
+    def calculate_optimal_frames(self, target_fps: float = 20.0) -> int:
+        """Calcula frames óptimos basado en FPS objetivo."""
+        optimal = int(self.duration * target_fps)
+        return max(1, min(optimal, self.total_frames))
+
+    def extract_frames(
+        self,
+        output_dir: Path,
+        num_frames: Optional[int],
+        width: int,
+        height: int,
+        quality: int,
+        target_fps: float,
+        fmt: ImageFormat,
+        sample_fps: Optional[float] = None,
+        fused_resize: bool = False,
+        batch_size: int = BATCH_SIZE,
+        console: Optional[Console] = None,
+    ) -> list[Path]:
+        """Extrae frames espaciados uniformemente usando batch loading."""
+        import numpy as np
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        if num_frames is None:
+            if sample_fps is not None:
+                num_frames = max(1, int(self.duration * sample_fps))
+            else:
+                num_frames = self.calculate_optimal_frames(target_fps)
+        num_frames = min(num_frames, self.total_frames)
+
+        # Índices espaciados uniformemente
+        if num_frames == 1:
+            indices = [self.total_frames // 2]
+        else:
+            indices = np.linspace(0, self.total_frames - 1, num_frames, dtype=int).tolist()
+
+        # Invariantes del bucle: parámetros de guardado y rutas de salida
+        extension = fmt.value
+        save_params = self._get_save_params(fmt, quality)
+        filepaths = [output_dir / f"frame{i:06d}.{extension}" for i in range(len(indices))]
+        workers = self._worker_count()
+
+        # Doble buffer (B, H, W, 3): un lote se redimensiona mientras se decodifica el siguiente.
+        # El padding se pone a cero una sola vez; el centro se sobrescribe en cada frame
+        if (width, height) == (self.width, self.height):
+            # Mismas dimensiones que el origen: los frames se codifican tal cual, sin buffer
+            buffers = [repeat(None)] * 2
+        else:
+            rows = min(batch_size, len(indices))
+            buffers = [np.zeros((rows, height, width, 3), dtype=np.uint8) for _ in range(2)]
+
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[bold blue]{task.description}"),
+            MofNCompleteColumn(),
+            BarColumn(bar_width=40),
+            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+            TimeRemainingColumn(),
+            console=console,
+        ) as progress, ThreadPoolExecutor(max_workers=workers) as executor, _FrameWriter() as writer:
+            task = progress.add_task("Extrayendo frames...", total=len(indices))
+
+            # Referencias locales: evitan búsquedas de atributos en el bucle caliente
+            read_batch, presized = self._batch_reader(width, height, fused_resize)
+            process = partial(self._process_frame, save_params=save_params, presized=presized)
+            encode_batch = partial(executor.map, process)
+            write, advance = writer.put, partial(progress.update, task, advance=1)
+
+            def drain(positions: list[int], encoded: Iterator[bytes]) -> None:
+                for pos, data in zip(positions, encoded):
+                    write(filepaths[pos], data)
+                    advance()
+
+            # La decodificación es serial; resize + encode del lote van al pool y la escritura al writer
+            pending = None
+            for batch_num, (positions, frames) in enumerate(self._iter_batches(read_batch, indices, batch_size)):
+                encoded = encode_batch(frames, buffers[batch_num % 2])
+                if pending is not None:
+                    drain(*pending)
+                pending = (positions, encoded)
+
+            if pending is not None:
+                drain(*pending)
+
+        return filepaths
+
+    def _worker_count(self) -> int:
+        """Hilos del pool sin sobresuscribir los núcleos que ya usa el decoder."""
+        # Con NVDEC la decodificación no consume núcleos de CPU
+        decode_threads = 0 if self.use_gpu else DECODE_THREADS
+        return max(1, min(MAX_WORKERS, (os.cpu_count() or 1) - decode_threads))
+
+    def _process_frame(
+        self, frame: "np.ndarray", out: Optional["np.ndarray"], save_params: dict, presized: bool = False
+    ) -> bytes:
+        """Redimensiona en `out` y codifica un frame en memoria (se ejecuta en el pool de hilos)."""
+        from PIL import Image
+
+        # Sin buffer de salida el frame ya tiene las dimensiones de destino
+        resized = frame if out is None else self._resize_into(frame, out, presized)
+
+        if save_params.get("format") == "JPEG" and self._jpeg_encoder is not None:
+            # libjpeg-turbo codifica directo desde RGB con SIMD
+            return self._jpeg_encoder(resized, quality=save_params["quality"])
+
+        # Convertir a PIL y codificar
+        buffer = io.BytesIO()
+        Image.fromarray(resized).save(buffer, **save_params)
+        return buffer.getvalue()
+
+    def _resized_reader(self, target_w: int, target_h: int) -> "VideoReader":
+        """Abre un VideoReader que redimensiona al decodificar.
+
+        En CPU, conversión YUV→RGB y escalado se hacen en una sola pasada del
+        decoder, sin buffer intermedio a resolución completa; en GPU lo hace NVDEC + CUDA.
+        """
+        from decord import VideoReader
+
+        new_w, new_h, *_ = self._resize_plan(target_w, target_h)
+        return VideoReader(
+            self.video_path,
+            ctx=self._ctx,
+            width=new_w,
+            height=new_h,
+            num_threads=DECODE_THREADS,
+        )
+
+    def _batch_reader(
+        self, target_w: int, target_h: int, fused_resize: bool
+    ) -> tuple[Callable[[list[int]], "np.ndarray"], bool]:
+        """Retorna (función que decodifica índices ordenados a (N, H, W, 3) RGB, frames ya redimensionados)."""
+        if self.backend == Backend.torchcodec:
+            return self._read_torchcodec, False
+
+        if self.use_gpu or fused_resize:
+            # En GPU (o con fused_resize) el decoder entrega frames ya redimensionados
+            vr = self._resized_reader(target_w, target_h)
+            return (lambda chunk: vr.get_batch(chunk).asnumpy()), True
+
+        vr = self.vr
+        return (lambda chunk: vr.get_batch(chunk).asnumpy()), False
+
+    def _read_torchcodec(self, chunk: list[int]) -> "np.ndarray":
+        """Decodifica un lote con torchcodec tolerando un número de frames sobrestimado."""
+        import numpy as np
+
+        decoder = self.decoder
+        try:
+            # Decodificación secuencial con salto entre keyframes en una sola llamada
+            return decoder.get_frames_at(indices=chunk).data.cpu().numpy()
+        except (IndexError, RuntimeError):
+            # Solo el final del video puede pedir frames inexistentes; el resto es un error real
+            tail_start = self.total_frames - TAIL_SLACK_FRAMES
+            if chunk[-1] < tail_start:
+                raise
+
+        # En modo aproximado el header puede declarar más frames de los que existen: los
+        # índices finales inexistentes repiten el último frame decodificable
+        frames = []
+        missing: Optional[Exception] = None
+        for index in chunk:
+            try:
+                frame = decoder.get_frame_at(index).data.cpu().numpy()
+            except (IndexError, RuntimeError) as e:
+                if index < tail_start:
+                    raise
+                missing = missing or e
+                frames.append(frames[-1] if frames else self._last_torchcodec_frame(index))
+                continue
+            if missing is not None:
+                # Un frame posterior sí existe: el que falló no estaba más allá del final
+                raise missing
+            frames.append(frame)
+        return np.stack(frames)
+
+    def _last_torchcodec_frame(self, index: int) -> "np.ndarray":
+        """Busca hacia atrás, como mucho TAIL_SLACK_FRAMES, el último frame decodificable."""
+        for fallback in range(index - 1, max(-1, index - 1 - TAIL_SLACK_FRAMES), -1):
+            try:
+                return self.decoder.get_frame_at(fallback).data.cpu().numpy()
+            except (IndexError, RuntimeError):
+                continue
+        raise IndexError(f"torchcodec no pudo decodificar el frame {index} ni los {TAIL_SLACK_FRAMES} anteriores")
+
+    def _iter_batches(
+        self, read_batch: Callable[[list[int]], "np.ndarray"], indices: list[int], batch_size: int
+    ) -> Iterator[tuple[list[int], "np.ndarray"]]:
+        """Decodifica por lotes en orden creciente; retorna (posiciones originales, frames RGB)."""
+        import numpy as np
+
+        order = np.argsort(indices, kind="stable")
+        sorted_indices = np.asarray(indices)[order]
+
+        # Lotes acotados para limitar el pico de memoria (N, H, W, 3)
+        for start in range(0, len(order), batch_size):
+            chunk = sorted_indices[start:start + batch_size].tolist()
+            yield order[start:start + batch_size].tolist(), read_batch(chunk)
+
+    def _resize_into(self, image: "np.ndarray", out: "np.ndarray", presized: bool = False) -> "np.ndarray":
+        """Redimensiona manteniendo aspecto dentro de `out` (H, W, 3), cuyo padding ya es negro."""
+        import numpy as np
+        from PIL import Image
+
+        target_h, target_w = out.shape[:2]
+        h, w = image.shape[:2]
+        if (w, h) == (target_w, target_h):
+            # Mismas dimensiones: ni resize ni padding
+            return image
+
+        if presized:
+            # Frame ya redimensionado por el decoder: solo falta el padding
+            x_offset, y_offset = (target_w - w) // 2, (target_h - h) // 2
+            out[y_offset:y_offset + h, x_offset:x_offset + w] = image
+            return out
+
+        # Frames a resolución completa (los pre-redimensionados ya salieron arriba)
+        new_w, new_h, x_offset, y_offset, supersample = self._resize_plan(target_w, target_h)
+        region = out[y_offset:y_offset + new_h, x_offset:x_offset + new_w]
+
+        if (new_w, new_h) == (w, h):
+            # El frame ya cabe exacto: solo falta el padding
+            region[...] = image
+        elif self._simd_resizer is not None:
+            region[...] = self._resize_simd(image, new_w, new_h, supersample)
+        else:
+            # Usar PIL para resize de alta calidad (LANCZOS); reducing_gap hace el paso box previo
+            pil_img = Image.fromarray(image)
+            region[...] = np.asarray(
+                pil_img.resize(
+                    (new_w, new_h),
+                    Image.Resampling.LANCZOS,
+                    reducing_gap=2.0 if supersample else None,
+                )
+            )
+
+        return out
+
+    def _resize_plan(self, target_w: int, target_h: int) -> tuple[int, int, int, int, bool]:
+        """Retorna (new_w, new_h, x_offset, y_offset, supersample) para el video de origen.
+
+        Solo depende de las dimensiones de origen (fijas) y del destino: se calcula una vez.
+        """
+        key = (target_w, target_h)
+        cached = self._resize_plan_cache
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        ratio = min(target_w / self.width, target_h / self.height)
+        new_w, new_h = int(self.width * ratio), int(self.height * ratio)
+        # Reducciones fuertes (ej. 4K → thumbnails): box/área primero, más rápido y sin aliasing
+        plan = (new_w, new_h, (target_w - new_w) // 2, (target_h - new_h) // 2, ratio < DOWNSCALE_RATIO)
+        self._resize_plan_cache = (key, plan)
+        return plan
+
+    def _resize_simd(
+        self, image: "np.ndarray", new_w: int, new_h: int, supersample: bool = False
+    ) -> "np.ndarray":
+        """Resize Lanczos3 (área en reducciones fuertes) con cykooz.resizer (AVX2/SSE4.1/NEON)."""
+        import numpy as np
+
+        cr = self._simd_resizer
+        # Resizer guarda buffers internos: uno por hilo del pool
+        resizer = getattr(self._local, "resizer", None)
+        if resizer is None:
+            resizer = self._local.resizer = cr.Resizer()
+            self._local.options = cr.ResizeOptions(
+                resize_alg=cr.ResizeAlg.convolution(cr.FilterType.lanczos3)
+            )
+            self._local.options_area = cr.ResizeOptions(
+                # Filtro de área: promedia los píxeles de origen en lugar de descartarlos
+                resize_alg=cr.ResizeAlg.convolution(cr.FilterType.box)
+            )
+        options = self._local.options_area if supersample else self._local.options
+
+        dst = getattr(self._local, "resize_dst", None)
+        if dst is None or (dst.width, dst.height) != (new_w, new_h):
+            dst = self._local.resize_dst = cr.ImageData(new_w, new_h, cr.PixelType.U8x3)
+
+        h, w = image.shape[:2]
+        src = cr.ImageData(w, h, cr.PixelType.U8x3, image.tobytes())
+        resizer.resize(src, dst, options)
+
+        return np.frombuffer(dst.get_buffer(), dtype=np.uint8).reshape(new_h, new_w, 3)
+
+    @staticmethod
+    def _get_save_params(fmt: ImageFormat, quality: int) -> dict:
+        """Retorna parámetros de guardado según formato."""
+        if fmt == ImageFormat.jpg:
+            return {"format": "JPEG", "quality": quality}
+        elif fmt == ImageFormat.png:
+            compress = max(0, min(9, (100 - quality) // 10))
+            return {"format": "PNG", "compress_level": compress}
+        elif fmt == ImageFormat.webp:
+            return {"format": "WEBP", "quality": quality}
+        return {}
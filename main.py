@@ -6,23 +6,13 @@ Extrae frames de videos de forma rápida y eficiente.
 
 from pathlib import Path
 from typing import Optional
-from enum import Enum
 
-import numpy as np
 import typer
-from decord import VideoReader, cpu, gpu
-from PIL import Image
 from rich.console import Console
-from rich.progress import (
-    Progress,
-    SpinnerColumn,
-    BarColumn,
-    TextColumn,
-    TimeRemainingColumn,
-    MofNCompleteColumn,
-)
 from rich.table import Table
 
+from extractor import BATCH_SIZE, MAX_BATCH_SIZE, Backend, ImageFormat, VideoFrameExtractor
+
 app = typer.Typer(
     name="videoframeextractor",
     help="CLI de alto rendimiento para extraer frames de videos.",
@@ -30,128 +20,8 @@ app = typer.Typer(
 )
 console = Console()
 
-
-class ImageFormat(str, Enum):
-    """Formatos de imagen soportados."""
-    jpg = "jpg"
-    png = "png"
-    webp = "webp"
-
-
-class VideoFrameExtractor:
-    """Extractor de frames de video usando Decord (2-3x más rápido que OpenCV)."""
-
-    def __init__(self, video_path: str, use_gpu: bool = False, gpu_id: int = 0):
-        self.video_path = video_path
-        self.use_gpu = use_gpu
-        ctx = gpu(gpu_id) if use_gpu else cpu(0)
-        self.vr = VideoReader(video_path, ctx=ctx)
-        self.fps = self.vr.get_avg_fps()
-        self.total_frames = len(self.vr)
-        self.width, self.height = self.vr[0].shape[1], self.vr[0].shape[0]
-        self.duration = self.total_frames / self.fps if self.fps > 0 else 0
-
-    def get_info(self) -> dict:
-        """Retorna metadatos del video."""
-        return {
-            "fps": self.fps,
-            "total_frames": self.total_frames,
-            "width": self.width,
-            "height": self.height,
-            "duration": self.duration,
-        }
-
-    def calculate_optimal_frames(self, target_fps: float = 20.0) -> int:
-        """Calcula frames óptimos basado en FPS objetivo."""
-        optimal = int(self.duration * target_fps)
-        return max(1, min(optimal, self.total_frames))
-
-    def extract_frames(
-        self,
-        output_dir: Path,
-        num_frames: Optional[int],
-        width: int,
-        height: int,
-        quality: int,
-        target_fps: float,
-        fmt: ImageFormat,
-        sample_fps: Optional[float] = None,
-    ) -> list[Path]:
-        """Extrae frames espaciados uniformemente usando batch loading."""
-        output_dir.mkdir(parents=True, exist_ok=True)
-
-        if num_frames is None:
-            if sample_fps is not None:
-                num_frames = max(1, int(self.duration * sample_fps))
-            else:
-                num_frames = self.calculate_optimal_frames(target_fps)
-        num_frames = min(num_frames, self.total_frames)
-
-        # Índices espaciados uniformemente
-        if num_frames == 1:
-            indices = [self.total_frames // 2]
-        else:
-            indices = np.linspace(0, self.total_frames - 1, num_frames, dtype=int).tolist()
-
-        extracted = []
-        extension = fmt.value
-
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[bold blue]{task.description}"),
-            MofNCompleteColumn(),
-            BarColumn(bar_width=40),
-            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-            TimeRemainingColumn(),
-            console=console,
-        ) as progress:
-            task = progress.add_task("Extrayendo frames...", total=len(indices))
-
-            for idx, frame_idx in enumerate(indices):
-                frame = self.vr[frame_idx].asnumpy()  # RGB numpy array
-                resized = self._resize_with_padding(frame, width, height)
-
-                # Convertir a PIL y guardar
-                img = Image.fromarray(resized)
-                filepath = output_dir / f"frame{idx:06d}.{extension}"
-
-                save_params = self._get_save_params(fmt, quality)
-                img.save(filepath, **save_params)
-
-                extracted.append(filepath)
-                progress.update(task, advance=1)
-
-        return extracted
-
-    def _resize_with_padding(self, image: np.ndarray, target_w: int, target_h: int) -> np.ndarray:
-        """Redimensiona manteniendo aspecto con padding negro."""
-        h, w = image.shape[:2]
-        ratio = min(target_w / w, target_h / h)
-        new_w, new_h = int(w * ratio), int(h * ratio)
-
-        # Usar PIL para resize de alta calidad (LANCZOS)
-        pil_img = Image.fromarray(image)
-        resized = pil_img.resize((new_w, new_h), Image.Resampling.LANCZOS)
-
-        # Crear canvas con padding
-        canvas = Image.new("RGB", (target_w, target_h), (0, 0, 0))
-        x_offset = (target_w - new_w) // 2
-        y_offset = (target_h - new_h) // 2
-        canvas.paste(resized, (x_offset, y_offset))
-
-        return np.array(canvas)
-
-    @staticmethod
-    def _get_save_params(fmt: ImageFormat, quality: int) -> dict:
-        """Retorna parámetros de guardado según formato."""
-        if fmt == ImageFormat.jpg:
-            return {"format": "JPEG", "quality": quality}
-        elif fmt == ImageFormat.png:
-            compress = max(0, min(9, (100 - quality) // 10))
-            return {"format": "PNG", "compress_level": compress}
-        elif fmt == ImageFormat.webp:
-            return {"format": "WEBP", "quality": quality}
-        return {}
+# Salidas más pequeñas que esto sugieren WebP (menos bytes a disco que JPEG)
+WEBP_HINT_PIXELS = 1280 * 720
 
 
 def format_duration(seconds: float) -> str:
@@ -174,35 +44,56 @@ def show_video_info(extractor: VideoFrameExtractor, filename: str) -> None:
     table.add_row("Frames totales", f"{info['total_frames']:,}")
     table.add_row("Resolución", f"{info['width']}x{info['height']}")
     table.add_row("Dispositivo", "GPU" if extractor.use_gpu else "CPU")
+    table.add_row("Backend", extractor.backend.value)
 
     console.print(table)
 
 
+def _open_extractor(video: Path, use_gpu: bool, gpu_id: int, backend: Backend) -> VideoFrameExtractor:
+    """Abre el video mostrando un spinner mientras se analiza."""
+    device_msg = f"GPU {gpu_id}" if use_gpu else "CPU"
+    with console.status(f"[bold blue]Abriendo video en {device_msg} y analizando frames...", spinner="dots"):
+        return VideoFrameExtractor(str(video), use_gpu=use_gpu, gpu_id=gpu_id, backend=backend)
+
+
 @app.command()
 def extract(
     video: Path = typer.Argument(..., help="Ruta al archivo de video", exists=True),
-    num_frames: Optional[int] = typer.Option(None, "-n", "--num-frames", help="Número de frames (auto si se omite)"),
-    width: int = typer.Option(1200, "-w", "--width", help="Ancho de las imágenes"),
-    height: int = typer.Option(680, "-H", "--height", help="Alto de las imágenes"),
+    num_frames: Optional[int] = typer.Option(None, "-n", "--num-frames", min=1, help="Número de frames (auto si se omite)"),
+    width: int = typer.Option(1200, "-w", "--width", min=1, help="Ancho de las imágenes"),
+    height: int = typer.Option(680, "-H", "--height", min=1, help="Alto de las imágenes"),
     output: Path = typer.Option(Path("frames_output"), "-o", "--output", help="Directorio de salida"),
     quality: int = typer.Option(95, "-q", "--quality", min=0, max=100, help="Calidad (0-100)"),
     fps: float = typer.Option(20.0, "--fps", help="FPS para cálculo automático de frames"),
     sample_fps: Optional[float] = typer.Option(None, "--sample-fps", help="Frames por segundo a muestrear (ej: 10 guarda 10fps del video). Ignorado si se usa --num-frames"),
-    fmt: ImageFormat = typer.Option(ImageFormat.jpg, "-f", "--format", help="Formato de imagen"),
+    fmt: ImageFormat = typer.Option(ImageFormat.jpg, "-f", "--format", help="Formato de imagen (webp recomendado por debajo de 1280x720)"),
     info_only: bool = typer.Option(False, "--info", help="Solo mostrar información del video"),
-    use_gpu: bool = typer.Option(False, "--gpu", help="Usar GPU para decodificación (requiere CUDA)"),
-    gpu_id: int = typer.Option(0, "--gpu-id", help="ID de la GPU a usar (default: 0)"),
+    use_gpu: bool = typer.Option(False, "--gpu", help="Usar GPU para decodificar (con Decord también redimensiona; requiere CUDA; usa CPU si falla)"),
+    gpu_id: int = typer.Option(0, "--gpu-id", min=0, help="ID de la GPU a usar (default: 0)"),
+    backend: Backend = typer.Option(Backend.decord, "--backend", help="Backend de decodificación (torchcodec requiere instalarlo aparte)"),
+    batch_size: int = typer.Option(BATCH_SIZE, "--batch-size", min=1, max=MAX_BATCH_SIZE, help="Frames por lote de decodificación/resize"),
+    fast_resize: bool = typer.Option(False, "--fast-resize", help="Redimensionar dentro del decoder en una sola pasada (solo Decord; más rápido, filtro bicúbico en vez de LANCZOS)"),
 ) -> None:
     """Extrae frames de un video de forma rápida y eficiente."""
     try:
-        device_msg = f"GPU {gpu_id}" if use_gpu else "CPU"
-        with console.status(f"[bold blue]Abriendo video en {device_msg} y analizando frames...", spinner="dots"):
-            extractor = VideoFrameExtractor(str(video), use_gpu=use_gpu, gpu_id=gpu_id)
-    except Exception as e:
-        console.print(f"[red]Error al abrir el video:[/red] {e}")
-        if use_gpu:
-            console.print("[yellow]Tip: Asegúrate de tener CUDA instalado y una GPU compatible.[/yellow]")
+        extractor = _open_extractor(video, use_gpu, gpu_id, backend)
+    except ImportError as e:
+        # Backend no instalado: no es un problema de GPU ni del archivo
+        console.print(f"[red]Backend '{backend.value}' no disponible:[/red] {e}")
         raise typer.Exit(1)
+    except Exception as e:
+        if not use_gpu:
+            console.print(f"[red]Error al abrir el video:[/red] {e}")
+            raise typer.Exit(1)
+        gpu_error = e
+        # Si en CPU tampoco abre, el problema es el video y no la GPU
+        try:
+            extractor = _open_extractor(video, use_gpu=False, gpu_id=gpu_id, backend=backend)
+        except Exception as e:
+            console.print(f"[red]Error al abrir el video:[/red] {e}")
+            raise typer.Exit(1)
+        console.print(f"[yellow]No se pudo inicializar la GPU {gpu_id}:[/yellow] {gpu_error}")
+        console.print("[yellow]Tip: Asegúrate de tener CUDA instalado y una GPU compatible. Usando CPU.[/yellow]")
 
     show_video_info(extractor, video.name)
 
@@ -218,12 +109,18 @@ def extract(
     else:
         actual_frames = extractor.calculate_optimal_frames(fps)
 
+    if fast_resize and backend != Backend.decord:
+        console.print(f"[yellow]--fast-resize solo aplica con --backend decord; se ignora con {backend.value}.[/yellow]")
+        fast_resize = False
+
     console.print("\n[bold]Configuración:[/bold]")
     console.print(f"  Frames a extraer: [cyan]{actual_frames}[/cyan]")
     if sample_fps is not None and num_frames is None:
         console.print(f"  Sampling: [cyan]{sample_fps} fps[/cyan] × {extractor.duration:.1f}s = {actual_frames} frames")
     console.print(f"  Dimensiones: [cyan]{width}x{height}[/cyan]")
     console.print(f"  Formato: [cyan]{fmt.value.upper()}[/cyan] (calidad: {quality}%)")
+    if fmt == ImageFormat.jpg and width * height < WEBP_HINT_PIXELS:
+        console.print("  [dim]Tip: a esta resolución -f webp genera archivos ~25-35% más pequeños[/dim]")
     console.print(f"  Salida: [cyan]{output}[/cyan]\n")
 
     # Extraer
@@ -236,6 +133,9 @@ def extract(
         target_fps=fps,
         fmt=fmt,
         sample_fps=sample_fps,
+        fused_resize=fast_resize,
+        batch_size=batch_size,
+        console=console,
     )
 
     if extracted: